@@ -9,6 +9,10 @@ Parameters from `2004/January/21/elphf0214`
 We start by defining a 1D mesh
 
     >>> from fipy import PhysicalField as PF
+    >>> from fipy import CellVariable, FaceVariable, Grid1D, TransientTerm, DiffusionTerm, ImplicitSourceTerm, PowerLawConvectionTerm, TSVViewer, Viewer, input
+    >>> from fipy.tools import numerix
+    >>> from builtins import range
+    >>> from builtins import str
 
     >>> RT = (PF("1 Nav*kB") * PF("298 K"))
     >>> molarVolume = PF("1.80000006366754e-05 m**3/mol")
@@ -19,7 +23,10 @@ We start by defining a 1D mesh
     >>> dx = L / nx
     >>> # nx = 200
     >>> # dx = PF("0.01 nm")
-    >>> ## dx = PF("0.001 nm") * (1.001 - 1/cosh(arange(-10, 10, .01)))
+    >>> ## dx = numerix.cosh(numerix.arange(-10., 10., .01))
+    >>> ## dx = numerix.reciprocal(dx, out=dx)
+    >>> ## dx = numerix.subtract(1.001, dx, out=dx)
+    >>> ## dx = PF("0.001 nm") * dx
     >>> # L = nx * dx
     >>> mesh = Grid1D(dx = dx, nx = nx)
     >>> # mesh = Grid1D(dx = dx)
@@ -131,10 +138,11 @@ and the solvent and a liquid phase rich in the two substitutional species
 Once again, we start with a sharp phase boundary
 
     >>> x = mesh.cellCenters[0]
-    >>> phase.setValue(x < L / 2)
-    >>> interstitials[0].setValue("0.000111111503177394 mol/l" * molarVolume, where=x > L / 2)
-    >>> substitutionals[0].setValue("0.249944439430068 mol/l" * molarVolume, where=x > L / 2)
-    >>> substitutionals[1].setValue("0.249999982581341 mol/l" * molarVolume, where=x > L / 2)
+    >>> liquid = (x > L / 2).value
+    >>> phase.setValue(0., where=liquid)
+    >>> interstitials[0].setValue("0.000111111503177394 mol/l" * molarVolume, where=liquid)
+    >>> substitutionals[0].setValue("0.249944439430068 mol/l" * molarVolume, where=liquid)
+    >>> substitutionals[1].setValue("0.249999982581341 mol/l" * molarVolume, where=liquid)
 
 We again create the phase equation as in ``examples.elphf.phase.input1D``
 
@@ -152,15 +160,24 @@ We linearize the source term in the same way as in `example.phase.simple.input1D
     ...     enthalpy += component * component.standardPotential
     ...     barrier += component * component.barrier
 
-    >>> mXi = -(30 * phase * (1 - phase) * enthalpy +  4 * (0.5 - phase) * barrier)
-    >>> dmXidXi = (-60 * (0.5 - phase) * enthalpy + 4 * barrier)
-    >>> S1 = dmXidXi * phase * (1 - phase) + mXi * (1 - 2 * phase)
-    >>> S0 = mXi * phase * (1 - phase) - phase * S1
+    >>> xi1mxi = phase * (1 - phase)
+    >>> halfmxi = 0.5 - phase
+    >>> mXi = -(30 * xi1mxi * enthalpy +  4 * halfmxi * barrier)
+    >>> dmXidXi = (-60 * halfmxi * enthalpy + 4 * barrier)
+    >>> S1 = dmXidXi * xi1mxi + 2 * mXi * halfmxi
+    >>> S0 = mXi * xi1mxi - phase * S1
 
     >>> phase.equation -= S0 + ImplicitSourceTerm(coeff = S1)
 
 and we create the diffusion equation for the solute as in
-``examples.elphf.diffusion.input1D``
+``examples.elphf.diffusion.input1D``. The face quantities that do not
+depend on the species are built once and shared by every equation
+
+    >>> pPrimeFace = pPrime(phase).harmonicFaceValue
+    >>> gPrimeFace = gPrime(phase).harmonicFaceValue
+    >>> phaseGrad = phase.faceGrad
+    >>> potentialGrad = potential.faceGrad
+    >>> solventFace = solvent.harmonicFaceValue
 
     >>> for Cj in substitutionals:
     ...     CkSum = ComponentVariable(mesh = mesh, value = 0.)
@@ -172,13 +189,13 @@ and we create the diffusion equation for the solute as in
     ...     counterDiffusion = CkSum.faceGrad
     ...     # phaseTransformation = (pPrime(phase.harmonicFaceValue) * Cj.standardPotential
     ...     #         + gPrime(phase.harmonicFaceValue) * Cj.barrier) * phase.faceGrad
-    ...     phaseTransformation = (pPrime(phase).harmonicFaceValue * Cj.standardPotential
-    ...             + gPrime(phase).harmonicFaceValue * Cj.barrier) * phase.faceGrad
+    ...     phaseTransformation = (pPrimeFace * Cj.standardPotential
+    ...             + gPrimeFace * Cj.barrier) * phaseGrad
     ...     # phaseTransformation = (p(phase).faceGrad * Cj.standardPotential
     ...     #         + g(phase).faceGrad * Cj.barrier)
-    ...     electromigration = Cj.valence * potential.faceGrad
+    ...     electromigration = Cj.valence * potentialGrad
     ...     convectionCoeff = counterDiffusion + \
-    ...         solvent.harmonicFaceValue * (phaseTransformation + electromigration)
+    ...         solventFace * (phaseTransformation + electromigration)
     ...     convectionCoeff *= (Cj.diffusivity / (1. - CkFaceSum))
     ... 
     ...     Cj.equation = (TransientTerm()
@@ -188,11 +205,11 @@ and we create the diffusion equation for the solute as in
     >>> for Cj in interstitials:
     ...     # phaseTransformation = (pPrime(phase.harmonicFaceValue) * Cj.standardPotential
     ...     #         + gPrime(phase.harmonicFaceValue) * Cj.barrier) * phase.faceGrad
-    ...     phaseTransformation = (pPrime(phase).harmonicFaceValue * Cj.standardPotential
-    ...             + gPrime(phase).harmonicFaceValue * Cj.barrier) * phase.faceGrad
+    ...     phaseTransformation = (pPrimeFace * Cj.standardPotential
+    ...             + gPrimeFace * Cj.barrier) * phaseGrad
     ...     # phaseTransformation = (p(phase).faceGrad * Cj.standardPotential
     ...     #         + g(phase).faceGrad * Cj.barrier)
-    ...     electromigration = Cj.valence * potential.faceGrad
+    ...     electromigration = Cj.valence * potentialGrad
     ...     convectionCoeff = Cj.diffusivity * (1 + Cj.harmonicFaceValue) * \
     ...         (phaseTransformation + electromigration)
     ...
@@ -210,7 +227,6 @@ And Poisson's equation
 
 If running interactively, we create viewers to display the results
 
-    >>> from fipy import input
     >>> if __name__ == '__main__':
     ...     phaseViewer = Viewer(vars=phase, datamin=0, datamax=1)
     ...     concViewer = Viewer(vars=[solvent] + substitutionals + interstitials, ylog=True)
@@ -221,19 +237,37 @@ If running interactively, we create viewers to display the results
     ...     input("Press a key to continue")
 
 Again, this problem does not have an analytical solution, so after
-iterating to equilibrium
-
-    >>> solver = LinearLUSolver(tolerance = 1e-3)
+iterating to equilibrium with a separate solver for each equation. The
+symmetric phase and Poisson equations use a ``LinearPCGSolver`` and the
+species convection-diffusion equations use a ``LinearGMRESSolver``, each
+with the default preconditioner and tolerance of the solver suite. The
+suite, e.g. :ref:`SCIPY`, is chosen at run time with the
+:envvar:`FIPY_SOLVERS` environment variable or a command-line flag such
+as ``--scipy`` (see :ref:`SOLVERS`). The PyAMGX suite calls these
+solvers ``LinearCGSolver`` and ``LinearFGMRESSolver``
+
+    >>> try:
+    ...     from fipy import LinearPCGSolver, LinearGMRESSolver
+    ... except ImportError:
+    ...     from fipy import LinearCGSolver as LinearPCGSolver
+    ...     from fipy import LinearFGMRESSolver as LinearGMRESSolver
+
+    >>> components = substitutionals + interstitials
+    >>> fields = [phase, potential] + components
+
+    >>> phase.solver = LinearPCGSolver()
+    >>> potential.solver = LinearPCGSolver()
+    >>> for Cj in components:
+    ...     Cj.solver = LinearGMRESSolver()
 
     >>> potential.constrain(0., mesh.facesLeft)
 
-    >>> phase.residual = CellVariable(mesh = mesh)
-    >>> potential.residual = CellVariable(mesh = mesh)
-    >>> for Cj in substitutionals + interstitials:
-    ...     Cj.residual = CellVariable(mesh = mesh)
-    >>> residualViewer = Viewer(vars = [phase.residual, potential.residual] + [Cj.residual for Cj in substitutionals + interstitials])
+    >>> for field in fields:
+    ...     field.residual = CellVariable(mesh = mesh)
+    >>> if __name__ == '__main__':
+    ...     residualViewer = Viewer(vars = [field.residual for field in fields])
 
-    >>> tsv = TSVViewer(vars = [phase, potential] + substitutionals + interstitials)
+    >>> tsv = TSVViewer(vars = fields)
 
     >>> dt = substitutionals[0].diffusivity * 100
     >>> # dt = 1.
@@ -245,13 +279,13 @@ iterating to equilibrium
     >>> thisTimeStep = 0.
     >>> print("%3s: %20s | %20s | %20s | %20s" % ("i", "elapsed", "this", "next dt", "residual"))
     >>> residual = 0.
-    >>> from builtins import range
-    >>> from builtins import str
-    >>> for i in range(500): # iterate
+    >>> steps = 500
+    >>> plotStride = 10
+    >>> for i in range(steps): # iterate
     ...     if thisTimeStep == 0.:
     ...         tsv.plot(filename = "%s.tsv" % str(elapsed * timeStep))
     ... 
-    ...     for field in [phase, potential] + substitutionals + interstitials:
+    ...     for field in fields:
     ...         field.updateOld()
     ... 
     ...     while True:
@@ -260,29 +294,33 @@ iterating to equilibrium
     ...             # raw_input()
     ...             residual = 0.
     ... 
-    ...             phase.equation.solve(var = phase, dt = dt)
-    ...             # print phase.name, phase.equation.residual.max()
-    ...             residual = max(phase.equation.residual.max(), residual)
-    ...             phase.residual[:] = phase.equation.residual
+    ...             phase.equation.sweep(var = phase, dt = dt,
+    ...                                  solver = phase.solver,
+    ...                                  cacheResidual = True)
+    ...             # print phase.name, numerix.absolute(phase.equation.residualVector).max()
+    ...             residual = max(residual, float(numerix.absolute(phase.equation.residualVector).max()))
+    ...             phase.residual[:] = phase.equation.residualVector
     ... 
-    ...             potential.equation.solve(var = potential, dt = dt)
-    ...             # print potential.name, potential.equation.residual.max()
-    ...             residual = max(potential.equation.residual.max(), residual)
-    ...             potential.residual[:] = potential.equation.residual
+    ...             potential.equation.sweep(var = potential, dt = dt,
+    ...                                      solver = potential.solver,
+    ...                                      cacheResidual = True)
+    ...             # print potential.name, numerix.absolute(potential.equation.residualVector).max()
+    ...             residual = max(residual, float(numerix.absolute(potential.equation.residualVector).max()))
+    ...             potential.residual[:] = potential.equation.residualVector
     ... 
-    ...             for Cj in substitutionals + interstitials:
-    ...                 Cj.equation.solve(var = Cj,
+    ...             for Cj in components:
+    ...                 Cj.equation.sweep(var = Cj,
     ...                                   dt = dt,
-    ...                                   solver = solver)
-    ...                 # print Cj.name, Cj.equation.residual.max()
-    ...                 residual = max(Cj.equation.residual.max(), residual)
-    ...                 Cj.residual[:] = Cj.equation.residual
+    ...                                   solver = Cj.solver,
+    ...                                   cacheResidual = True)
+    ...                 # print Cj.name, numerix.absolute(Cj.equation.residualVector).max()
+    ...                 residual = max(residual, float(numerix.absolute(Cj.equation.residualVector).max()))
+    ...                 Cj.residual[:] = Cj.equation.residualVector
     ... 
     ...             # print
     ...             # phaseViewer.plot()
     ...             # concViewer.plot()
     ...             # potentialViewer.plot()
-    ...             # residualViewer.plot()
     ... 
     ...         residual /= maxError
     ...         if residual <= 1.:
@@ -308,30 +346,32 @@ iterating to equilibrium
     ...         dt = min(dt, desiredTimestep - thisTimeStep)
     ... 
     ...     if __name__ == '__main__':
-    ...         phaseViewer.plot()
-    ...         concViewer.plot()
-    ...         potentialViewer.plot()
+    ...         if i % plotStride == 0 or i == steps - 1:
+    ...             phaseViewer.plot()
+    ...             concViewer.plot()
+    ...             potentialViewer.plot()
+    ...             residualViewer.plot()
     ...         print("%3d: %20s | %20s | %20s | %g" % (i, str(elapsed * timeStep), str(thisTimeStep * timeStep), str(dt * timeStep), residual))
 
 
 we confirm that the far-field phases have remained separated
 
-    >>> ends = take(phase, (0, -1))
-    >>> allclose(ends, (1.0, 0.0), rtol = 1e-5, atol = 1e-5)
-    1
+    >>> ends = phase.value[[0, -1]]
+    >>> print(numerix.allclose(ends, (1.0, 0.0), rtol = 1e-5, atol = 1e-5))
+    True
 
 and that the concentration fields has appropriately segregated into into
 their respective phases
 
-    >>> ends = take(interstitials[0], (0, -1))
-    >>> allclose(ends, (0.4, 0.3), rtol = 3e-3, atol = 3e-3)
-    1
-    >>> ends = take(substitutionals[0], (0, -1))
-    >>> allclose(ends, (0.3, 0.4), rtol = 3e-3, atol = 3e-3)
-    1
-    >>> ends = take(substitutionals[1], (0, -1))
-    >>> allclose(ends, (0.1, 0.2), rtol = 3e-3, atol = 3e-3)
-    1
+    >>> ends = interstitials[0].value[[0, -1]]
+    >>> print(numerix.allclose(ends, (0.4, 0.3), rtol = 3e-3, atol = 3e-3))
+    True
+    >>> ends = substitutionals[0].value[[0, -1]]
+    >>> print(numerix.allclose(ends, (0.3, 0.4), rtol = 3e-3, atol = 3e-3))
+    True
+    >>> ends = substitutionals[1].value[[0, -1]]
+    >>> print(numerix.allclose(ends, (0.1, 0.2), rtol = 3e-3, atol = 3e-3))
+    True
 """
 from __future__ import unicode_literals
 __docformat__ = 'restructuredtext'